@@ -1,112 +1,137 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import sys
 import fnmatch
-import chardet
-import yaml
-from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
 
 # Define image extensions just like in the JS version
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"}
 
+def load_config(config_file):
+    """
+    Load the config mapping, dispatching on file extension:
+    .toml uses stdlib tomllib, .json uses stdlib json, and .yaml/.yml
+    (the historical default) imports PyYAML lazily — so invocations
+    using a stdlib format never pay PyYAML's import cost.
+    """
+    _, ext = os.path.splitext(config_file)
+    ext = ext.lower()
+    if ext == ".toml":
+        import tomllib
+        with open(config_file, 'rb') as f:
+            return tomllib.load(f)
+    if ext == ".json":
+        import json
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    import yaml
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
 def parse_ignore_file(ignore_file):
     """
-    Read the ignore file line by line, ignoring comments (#) and blank lines.
+    Read the ignore file in a single bytes pass, ignoring comments (#)
+    and blank lines. Only surviving pattern lines are decoded to str,
+    so comment-heavy files don't pay per-line string allocation.
     Return a list of ignore patterns.
     """
-    patterns = []
     if not os.path.isfile(ignore_file):
-        return patterns  # No file found, no patterns
-
-    with open(ignore_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            patterns.append(line)
-    return patterns
+        return []  # No file found, no patterns
+
+    with open(ignore_file, 'rb') as f:
+        raw = f.read()
+    # .strip() on bytes also drops the \r of Windows line endings
+    return [
+        line.decode('utf-8')
+        for line in (l.strip() for l in raw.splitlines())
+        if line and not line.startswith(b'#')
+    ]
+
+def compile_ignore_patterns(ignore_patterns):
+    """
+    Translate all fnmatch-style patterns into one combined regex, compiled
+    once, so each path is checked with a single match instead of a
+    per-pattern fnmatch loop. Each pattern gets a named group (p0, p1, ...)
+    so the matching pattern can still be reported in log messages.
+    Returns None if there are no patterns.
+    """
+    if not ignore_patterns:
+        return None
+    combined = "|".join(
+        f"(?P<p{i}>{fnmatch.translate(p)})" for i, p in enumerate(ignore_patterns)
+    )
+    return re.compile(combined)
 
-def should_ignore(relpath, ignore_patterns):
+def should_ignore(relpath, ignore_regex, ignore_patterns):
     """
-    Check if relpath matches any of the ignore patterns (fnmatch).
+    Check if relpath matches the combined ignore regex.
     If it matches, return (True, matched_pattern). Otherwise, (False, None).
     """
-    for pattern in ignore_patterns:
-        if fnmatch.fnmatch(relpath, pattern):
-            return True, pattern
+    if ignore_regex is None:
+        return False, None
+    m = ignore_regex.match(relpath)
+    if m:
+        return True, ignore_patterns[int(m.lastgroup[1:])]
     return False, None
 
+_WORD_RE = re.compile(r'\S+')
+
 def approximate_token_count(text):
     """
-    Roughly estimate token count by splitting on whitespace
-    and multiplying by ~1.2 to guess the number of tokens.
+    Roughly estimate token count by counting whitespace-delimited words
+    and multiplying by ~1.2. Counting via finditer avoids materializing
+    the list of word strings that text.split() would allocate just to
+    take its length.
     """
-    words = text.split()
-    return int(len(words) * 1.2)
+    words = sum(1 for _ in _WORD_RE.finditer(text))
+    return int(words * 1.2)
 
-def is_text_file(filepath, max_bytes=1024):
+def looks_binary(rawdata):
     """
-    Attempt to guess if a file is text by reading a small chunk
-    and checking encoding via chardet.
+    Cheap binary tell on an already-read buffer: a NUL byte means
+    we should not treat the file as text.
     """
-    try:
-        with open(filepath, 'rb') as f:
-            rawdata = f.read(max_bytes)
-        result = chardet.detect(rawdata)
-        if result['encoding'] is None or result['confidence'] < 0.5:
-            return False
-        return True
-    except Exception:
-        return False
-
-def skip_non_text_or_images(filepath, include_images=False):
-    """
-    Return True if the file should be skipped due to:
-      - It's an image file and include_images=False
-      - It's not text (according to chardet) AND not an image
-    Otherwise return False (meaning do NOT skip).
+    return b'\x00' in rawdata
+
+# package/import declarations only appear at the top of a Java file, so one
+# MULTILINE regex pass over the header replaces the per-line Python loop
+_JAVA_HEADER_RE = re.compile(
+    r'^\s*(?:package\s+([\w.]+)|import\s+(?:static\s+)?([\w.*]+))\s*;',
+    re.MULTILINE,
+)
+_JAVA_TYPE_DECL_RE = re.compile(
+    r'^(?:public\s+|final\s+|abstract\s+)*(?:class|interface|enum|record)\b',
+    re.MULTILINE,
+)
+
+def extract_package_and_imports(text):
     """
-    _, ext = os.path.splitext(filepath)
-    ext = ext.lower()
-
-    if ext in IMAGE_EXTENSIONS:
-        # If user doesn't want images, skip them
-        if not include_images:
-            return True
-        else:
-            # If include_images = True, we do not skip,
-            # but BFS for .java imports won't really apply here.
-            return False
-
-    # If not an image, check if it's text
-    if not is_text_file(filepath):
-        return True
-
-    return False
-
-def extract_package_and_imports(file_path):
-    """
-    Read a Java file, returning:
+    Parse already-read Java source text, returning:
       - package_name (string or None)
       - a list of import statements (list of strings)
+
+    Java forbids package/import statements after the first type
+    declaration, so the scan stops there instead of walking the whole
+    class body (which is 90%+ of a typical file). The declaration
+    search itself is capped at the first 16 KB: no realistic header
+    region is larger, so even a file whose type declaration the regex
+    fails to spot never pays for a full-body scan.
     """
+    prefix = text[:16384]
+    m = _JAVA_TYPE_DECL_RE.search(prefix)
+    header = prefix[:m.start()] if m else prefix
+
     package_name = None
     import_statements = []
-
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("package "):
-                    # remove 'package ' and trailing ';'
-                    package_name = line[len("package "):].rstrip(";")
-                elif line.startswith("import "):
-                    # remove 'import ' and trailing ';'
-                    imp = line[len("import "):].rstrip(";")
-                    import_statements.append(imp)
-    except Exception as e:
-        print(f"Warning: Could not read file {file_path}. Error: {e}", file=sys.stderr)
+    for pkg, imp in _JAVA_HEADER_RE.findall(header):
+        if pkg:
+            package_name = pkg
+        else:
+            import_statements.append(imp)
 
     return package_name, import_statements
 
@@ -115,31 +140,52 @@ def import_to_filepath(java_import):
     Convert a Java import (e.g., org.alliancegenome.curation_api.model.entities.SomeClass)
     into a possible relative file path, e.g.:
         org/alliancegenome/curation_api/model/entities/SomeClass.java
+
+    rpartition + replace does the whole transformation with one
+    allocation instead of the split/slice/join dance, and wildcard
+    imports (foo.bar.*) are rejected up front — they can never name a
+    single .java file.
     """
-    parts = java_import.strip().split('.')
-    if not parts:
+    pkg, _, cls = java_import.strip().rpartition('.')
+    if not pkg or not cls or '*' in cls:
         return None
-    class_name = parts[-1]
-    package_part = parts[:-1]
-    if not package_part or not class_name:
-        return None
-
-    package_path = "/".join(package_part)
-    return os.path.join(package_path, f"{class_name}.java")
+    return pkg.replace('.', '/') + '/' + cls + '.java'
 
-def find_file_in_repo(repo_root, relative_path, java_source_root):
+def build_java_index(repo_root, java_source_root):
+    """
+    Walk repo_root/java_source_root once, mapping each .java file's
+    source-root-relative path (like org/alliancegenome/.../Gene.java)
+    to its absolute path. Resolving an import is then a dict lookup
+    instead of a stat() per import, most of which would miss anyway.
+
+    Also returns the set of top-level package segments that actually
+    exist under the source root (e.g. {'org', 'com'}), so stdlib and
+    third-party imports (java.*, javax.*, org.apache.* when absent,
+    ...) can be rejected with one string check before any lookup.
+    """
+    index = {}
+    top_packages = set()
+    source_root = os.path.join(repo_root, java_source_root)
+    for root, dirs, files in os.walk(source_root):
+        for filename in files:
+            if filename.endswith(".java"):
+                abs_path = os.path.join(root, filename)
+                rel_path = os.path.relpath(abs_path, source_root)
+                index[rel_path] = abs_path
+                top_packages.add(rel_path.split(os.sep, 1)[0])
+    return index, top_packages
+
+def find_file_in_repo(java_index, relative_path):
     """
-    Given a repo root and a relative path (like org/alliancegenome/curation_api/model/entities/Gene.java),
+    Given the prebuilt .java index and a relative path (like
+    org/alliancegenome/curation_api/model/entities/Gene.java),
     return the full absolute path if it exists, else None.
     """
-    prefixed_rel_path = os.path.join(java_source_root, relative_path)
-    full_path = os.path.join(repo_root, prefixed_rel_path)
-    if os.path.isfile(full_path):
-        return full_path
-    return None
+    return java_index.get(relative_path)
 
 def traverse_java_deps(repo_root, start_files, ignore_patterns, java_source_root,
-                       do_token_count=False, include_images=False, max_depth="all"):
+                       output_queue, do_token_count=False, include_images=False,
+                       max_depth="all"):
     """
     BFS through Java dependencies starting from multiple start_files, with an optional depth limit.
 
@@ -151,12 +197,22 @@ def traverse_java_deps(repo_root, start_files, ignore_patterns, java_source_root
       - If 'max_depth' is an integer, we only expand that many levels
         of imports. If 'max_depth' == 'all', we expand fully.
 
+    Each accepted file is opened and read exactly once: the binary
+    sniff, token counting, and import parsing all run on the same
+    buffer, and the output section for the file is pushed onto
+    'output_queue' (consumed by create_flat_output on a writer thread),
+    so output writing overlaps the traversal and the queue's maxsize
+    bounds how many file contents sit in memory at once.
+
+    The traversal is level-synchronous: all files at the current BFS
+    depth are read in parallel by a thread pool (reads release the GIL,
+    so this overlaps disk latency), then their imports are merged
+    serially to form the next frontier.
+
     Returns:
-      (all_files, total_tokens): a list of unique Java files, plus approximate token count (if do_token_count=True).
+      (all_files, total_tokens): a list of unique Java files, plus
+      approximate token count (if do_token_count=True).
     """
-    visited = set()  # store absolute paths to avoid duplicates
-    queue = deque()
-
     # Convert max_depth to an integer or None if "all"
     if isinstance(max_depth, str) and max_depth.lower() == "all":
         max_depth = None  # means unlimited
@@ -166,102 +222,167 @@ def traverse_java_deps(repo_root, start_files, ignore_patterns, java_source_root
         # fallback if user typed something weird
         max_depth = None
 
-    # Initialize the queue with all start files, each with depth=0
-    for sf in start_files:
-        queue.append((sf, 0))
-
     all_files = []
     total_tokens = 0
 
-    while queue:
-        current_file, cur_depth = queue.popleft()
-        relpath = os.path.relpath(current_file, repo_root)
-
-        if current_file in visited:
-            print(f"Already processed '{relpath}'", file=sys.stderr)
-            continue
-
-        visited.add(current_file)
-
-        # Check ignore patterns
-        ignored, matched_pattern = should_ignore(relpath, ignore_patterns)
-        if ignored:
-            print(f"Skipping file '{relpath}' due to ignore pattern '{matched_pattern}'", file=sys.stderr)
-            continue
-
-        # Check if we should skip non-text/images
-        if skip_non_text_or_images(current_file, include_images):
-            print(f"Skipping binary/unwanted file '{relpath}'", file=sys.stderr)
-            continue
-
-        # If it's text, optionally accumulate token count
-        # (We won't do that for images, so this is safe)
-        _, ext = os.path.splitext(current_file)
-        ext = ext.lower()
-        if do_token_count and ext not in IMAGE_EXTENSIONS:
-            try:
-                with open(current_file, 'r', encoding='utf-8', errors='replace') as f:
-                    file_content = f.read()
-                total_tokens += approximate_token_count(file_content)
-            except Exception as e:
-                print(f"Warning: Could not read file {relpath}. Error: {e}", file=sys.stderr)
-
-        # Keep track of the file
-        all_files.append(current_file)
-
-        # If we've reached max_depth (cur_depth >= max_depth), do not expand further
-        if max_depth is not None and cur_depth >= max_depth:
-            continue
-
-        # If it's an image, there's no Java imports to parse, so skip BFS expansion
-        if ext in IMAGE_EXTENSIONS:
-            continue
-
-        # Otherwise, parse .java for imports
-        _, imports = extract_package_and_imports(current_file)
-        for imp in imports:
-            possible_rel_path = import_to_filepath(imp)
-            if not possible_rel_path:
-                continue
-            possible_abs_path = find_file_in_repo(repo_root, possible_rel_path, java_source_root)
-            if possible_abs_path and possible_abs_path not in visited:
-                queue.append((possible_abs_path, cur_depth + 1))
+    # One walk up front replaces a stat() per import during traversal
+    java_index, repo_top_packages = build_java_index(repo_root, java_source_root)
+
+    # Every traversed path was built by joining onto repo_root, so the
+    # repo-relative path is a constant-time prefix slice; os.path.relpath
+    # (abspath + normpath + split per call) is only the odd-case fallback.
+    repo_prefix = os.path.join(repo_root, '')
+
+    def to_relpath(path):
+        if path.startswith(repo_prefix):
+            return path[len(repo_prefix):]
+        return os.path.relpath(path, repo_root)
+
+    # One combined regex replaces a per-pattern fnmatch loop per file
+    ignore_regex = compile_ignore_patterns(ignore_patterns)
+
+    def read_and_parse(item):
+        """
+        Worker: single read + binary sniff + decode + import parse for one
+        file. Takes and returns the (path, relpath) pair so the relative
+        path computed at enqueue time is reused, not recomputed.
+        Returns (path, relpath, text, imports, error); text is None for
+        binary files, error is the exception if the read failed.
+        """
+        path, relpath = item
+        try:
+            # buffering=0: we do exactly one read() of the whole file, so
+            # the BufferedReader layer would only add an extra copy
+            with open(path, 'rb', buffering=0) as f:
+                rawdata = f.read()
+        except Exception as e:
+            return path, relpath, None, [], e
+        # Queued imports can only resolve to .java files, which are text
+        # by construction — only sniff paths without that suffix (i.e.
+        # non-Java start files from the config).
+        if not path.endswith('.java') and looks_binary(rawdata):
+            return path, relpath, None, [], None
+        text = rawdata.decode('utf-8', errors='replace')
+        _, imports = extract_package_and_imports(text)
+        return path, relpath, text, imports, None
+
+    # Deduplicate at enqueue time (absolute paths): the frontier never
+    # holds a file twice, so no wasted ignore/read work on duplicates
+    enqueued = set()
+
+    # Start files form the depth-0 frontier
+    frontier = []
+    for sf in start_files:
+        if sf not in enqueued:
+            enqueued.add(sf)
+            frontier.append(sf)
+    depth = 0
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        while frontier:
+            # Serial prefilter: dedup, ignore patterns, and image handling
+            # are cheap; only surviving files go to the thread pool.
+            to_read = []
+            for current_file in frontier:
+                relpath = to_relpath(current_file)
+
+                # Check ignore patterns
+                ignored, matched_pattern = should_ignore(relpath, ignore_regex, ignore_patterns)
+                if ignored:
+                    print(f"Skipping file '{relpath}' due to ignore pattern '{matched_pattern}'", file=sys.stderr)
+                    continue
+
+                _, ext = os.path.splitext(current_file)
+                ext = ext.lower()
+
+                # Images carry no Java imports and are never read; keep or skip by config
+                if ext in IMAGE_EXTENSIONS:
+                    if not include_images:
+                        print(f"Skipping binary/unwanted file '{relpath}'", file=sys.stderr)
+                        continue
+                    all_files.append(current_file)
+                    output_queue.put((f"===== FILE: {relpath} =====\n[Image file skipped]\n\n",))
+                    continue
+
+                to_read.append((current_file, relpath))
+
+            # Read the whole frontier in parallel, then merge serially
+            expand = max_depth is None or depth < max_depth
+            next_frontier = []
+            for path, relpath, text, imports, error in executor.map(read_and_parse, to_read):
+                if error is not None:
+                    print(f"Warning: Could not read file {relpath}. Error: {error}", file=sys.stderr)
+                    continue
+                if text is None:
+                    print(f"Skipping binary/unwanted file '{relpath}'", file=sys.stderr)
+                    continue
+
+                if do_token_count:
+                    total_tokens += approximate_token_count(text)
+
+                # Keep track of the file and hand its section to the writer
+                all_files.append(path)
+                output_queue.put((f"===== FILE: {relpath} =====\n", text, "\n"))
+
+                if not expand:
+                    continue
+
+                for imp in imports:
+                    # stdlib/third-party imports can't resolve here: their
+                    # top-level package doesn't exist under the source root
+                    if imp.split('.', 1)[0] not in repo_top_packages:
+                        continue
+                    possible_rel_path = import_to_filepath(imp)
+                    if not possible_rel_path:
+                        continue
+                    possible_abs_path = find_file_in_repo(java_index, possible_rel_path)
+                    if possible_abs_path and possible_abs_path not in enqueued:
+                        enqueued.add(possible_abs_path)
+                        next_frontier.append(possible_abs_path)
+
+            frontier = next_frontier
+            depth += 1
 
     return all_files, total_tokens
 
-def create_flat_output(files_list, repo_root, output_file, include_images=False):
+def create_flat_output(output_queue, output_file, errors):
     """
-    Write the contents of all given files to 'output_file', each preceded
-    by a header line.
-
-    If it's an image file and include_images=True, write "[Image file skipped]" to avoid binary data.
-    If it's an image file and include_images=False, it won't normally appear in files_list anyway
-    (since we skip it).
+    Consumer side of the traversal pipeline: pop section tuples pushed by
+    traverse_java_deps and stream them to 'output_file' until the None
+    sentinel arrives. Runs on its own thread so writing the flat file
+    overlaps the BFS reads instead of re-reading every file afterwards;
+    the queue's maxsize bounds peak memory to a handful of files.
+
+    The output is opened as an unbuffered binary file and each section's
+    pieces (header, content, trailing newline) go out through a single
+    os.writev gather call on POSIX — one syscall per file instead of one
+    per piece — with sequential writes as the fallback where writev is
+    unavailable (Windows).
+
+    If opening or writing fails, the exception is appended to 'errors'
+    and the queue is still drained to the sentinel — the producer blocks
+    on the bounded queue otherwise — so main() can join, report the
+    failure, and exit non-zero.
     """
-    combined_content = []
-    for fpath in files_list:
-        relpath = os.path.relpath(fpath, repo_root)
-        _, ext = os.path.splitext(fpath)
-        ext = ext.lower()
-
-        try:
-            if ext in IMAGE_EXTENSIONS:
-                # Just note that we're skipping binary data
-                combined_content.append(f"===== FILE: {relpath} =====\n[Image file skipped]\n\n")
-                continue
-
-            # Otherwise, read text content
-            with open(fpath, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            header = f"===== FILE: {relpath} =====\n"
-            combined_content.append(header + content + "\n")
-
-        except Exception as e:
-            print(f"Warning: Could not open file {relpath}. Error: {e}", file=sys.stderr)
-
-    final_output = "".join(combined_content)
-    with open(output_file, 'w', encoding='utf-8') as out_f:
-        out_f.write(final_output)
+    use_writev = hasattr(os, 'writev')
+    try:
+        with open(output_file, 'wb', buffering=0) as out_f:
+            fd = out_f.fileno()
+            while True:
+                section = output_queue.get()
+                if section is None:
+                    return
+                bufs = [piece.encode('utf-8') for piece in section]
+                if use_writev:
+                    os.writev(fd, bufs)
+                else:
+                    for buf in bufs:
+                        out_f.write(buf)
+    except Exception as e:
+        errors.append(e)
+        # Keep draining so traverse_java_deps never blocks on put()
+        while output_queue.get() is not None:
+            pass
 
 def main():
     if len(sys.argv) < 2:
@@ -273,12 +394,11 @@ def main():
         print(f"Error: Configuration file '{config_file}' does not exist.", file=sys.stderr)
         sys.exit(1)
 
-    # Load YAML config
+    # Load config (YAML, TOML, or JSON by extension)
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = load_config(config_file)
     except Exception as e:
-        print(f"Error reading YAML config: {e}", file=sys.stderr)
+        print(f"Error reading config: {e}", file=sys.stderr)
         sys.exit(1)
 
     # Extract config values
@@ -319,24 +439,42 @@ def main():
     else:
         print(f"No ignore patterns found in '{ignore_file}' (or file does not exist).")
 
+    # The writer thread drains sections while the BFS produces them, so
+    # the flat file is written concurrently with the traversal. Writer
+    # failures land in write_errors and are reported after the join.
+    output_queue = Queue(maxsize=64)
+    write_errors = []
+    writer = threading.Thread(target=create_flat_output, args=(output_queue, output_file, write_errors))
+    writer.start()
+
     # Traverse dependencies
-    all_files, total_tokens = traverse_java_deps(
-        repo_root=repo_root,
-        start_files=abs_start_files,
-        ignore_patterns=ignore_patterns,
-        java_source_root=java_source_root,
-        do_token_count=token_count,
-        include_images=include_images,
-        max_depth=depth_setting
-    )
+    try:
+        all_files, total_tokens = traverse_java_deps(
+            repo_root=repo_root,
+            start_files=abs_start_files,
+            ignore_patterns=ignore_patterns,
+            java_source_root=java_source_root,
+            output_queue=output_queue,
+            do_token_count=token_count,
+            include_images=include_images,
+            max_depth=depth_setting
+        )
+    finally:
+        # Signal EOF to the writer and wait for it to flush. Runs even
+        # when the traversal unwinds (e.g. KeyboardInterrupt): without
+        # the sentinel the non-daemon writer stays blocked in get() and
+        # the process hangs in interpreter shutdown.
+        output_queue.put(None)
+        writer.join()
+
+    if write_errors:
+        print(f"Error: Could not write output file '{output_file}': {write_errors[0]}", file=sys.stderr)
+        sys.exit(1)
 
     # Summarize
     print(f"Discovered {len(all_files)} unique Java files in the dependency chain.")
     if token_count:
         print(f"Approximate total tokens: {total_tokens}")
-
-    # Create a single flat file with code (or image-skipped message)
-    create_flat_output(all_files, repo_root, output_file, include_images=include_images)
     print(f"Wrote combined Java contents to '{output_file}'.")
 
 if __name__ == "__main__":
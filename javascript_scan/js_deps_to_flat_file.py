@@ -1,15 +1,38 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import sys
+import mmap
+import shutil
 import fnmatch
-import chardet
+import functools
 import yaml
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# charset-normalizer's binary probe is several times faster than
+# pure-Python chardet; fall back to chardet where it isn't installed
+try:
+    from charset_normalizer import is_binary as _cn_is_binary
+except ImportError:
+    import chardet
+    _cn_is_binary = None
 
 # List of typical image extensions we want to skip if include_images is false
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"}
 
+# Extensions we can classify without opening the file: known source/text
+# formats skip the encoding sniff entirely, and known binary formats are
+# rejected without even a read
+TEXT_EXTENSIONS = frozenset({
+    ".js", ".jsx", ".ts", ".tsx", ".json", ".css", ".scss", ".sass",
+    ".md", ".html", ".yaml", ".yml", ".txt",
+})
+BINARY_EXTENSIONS = frozenset({
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".pdf", ".zip", ".gz",
+    ".tar", ".ico", ".mp3", ".mp4", ".wasm",
+})
+
 def parse_ignore_file(ignore_file):
     """
     Read the ignore file line by line, ignoring comments (#) and blank lines.
@@ -27,33 +50,70 @@ def parse_ignore_file(ignore_file):
             patterns.append(line)
     return patterns
 
-def should_ignore(relpath, ignore_patterns):
+def compile_ignore_patterns(ignore_patterns):
     """
-    Check if relpath matches any of the ignore patterns (fnmatch).
-    If it matches, return (True, matched_pattern). Otherwise, (False, None).
+    Translate the fnmatch-style patterns into compiled regexes, bucketed
+    by leading literal path segment: directory-scoped patterns like
+    'node_modules/*' only need testing against paths that actually start
+    with 'node_modules', so each path is matched against its own bucket
+    plus the '' bucket of truly global patterns (e.g. '*.log') instead of
+    every rule. Each pattern keeps a named group (p0, p1, ...) carrying
+    its original index so the matching pattern can still be reported in
+    log messages. Returns a dict {first_segment: regex}, or None if there
+    are no patterns.
     """
-    for pattern in ignore_patterns:
-        if fnmatch.fnmatch(relpath, pattern):
-            return True, pattern
-    return False, None
-
-def approximate_token_count(text):
+    if not ignore_patterns:
+        return None
+    buckets = {}
+    for i, p in enumerate(ignore_patterns):
+        meta = len(p)
+        for ch in '*?[':
+            pos = p.find(ch)
+            if pos != -1 and pos < meta:
+                meta = pos
+        literal = p[:meta]
+        if '/' in literal:
+            seg = literal.split('/', 1)[0]
+        elif meta == len(p):
+            seg = literal  # fully literal pattern
+        else:
+            seg = ''  # glob starts inside the first segment
+        buckets.setdefault(seg, []).append((i, p))
+    return {
+        seg: re.compile("|".join(f"(?P<p{i}>{fnmatch.translate(p)})" for i, p in entries))
+        for seg, entries in buckets.items()
+    }
+
+def should_ignore(relpath, ignore_index, ignore_patterns):
     """
-    Roughly estimate token count by splitting on whitespace
-    and multiplying by ~1.2 to guess the number of tokens.
+    Check relpath against the bucket for its first path segment, then the
+    global bucket. If a pattern matches, return (True, matched_pattern).
+    Otherwise, (False, None).
     """
-    words = text.split()
-    return int(len(words) * 1.2)
+    if ignore_index is None:
+        return False, None
+    seg = relpath.split(os.sep, 1)[0]
+    for key in (seg, '') if seg else ('',):
+        regex = ignore_index.get(key)
+        if regex is not None:
+            m = regex.match(relpath)
+            if m:
+                return True, ignore_patterns[int(m.lastgroup[1:])]
+    return False, None
 
+@functools.lru_cache(maxsize=None)
 def is_text_file(filepath, max_bytes=1024):
     """
-    Attempt to guess if a file is text by reading a small chunk
-    and checking encoding via chardet.
-    If chardet.confidence < 0.5 or encoding is None, consider it binary.
+    Attempt to guess if a file is text by reading a small chunk and
+    checking encoding — via charset_normalizer when available, else
+    chardet (confidence < 0.5 or encoding None means binary).
+    Results are memoized per path so BFS revisits never re-sniff.
     """
     try:
         with open(filepath, 'rb') as f:
             rawdata = f.read(max_bytes)
+        if _cn_is_binary is not None:
+            return not _cn_is_binary(rawdata)
         result = chardet.detect(rawdata)
         if result['encoding'] is None or result['confidence'] < 0.5:
             return False
@@ -61,74 +121,120 @@ def is_text_file(filepath, max_bytes=1024):
     except Exception:
         return False
 
-def extract_js_imports(file_path, include_css=False):
+# Captures the quoted module specifier of `import ... from '...'`,
+# bare `import '...'`, and `require('...')` in one scan
+IMPORT_RE = re.compile(
+    r"""(?:^|[\s=(])(?:import\s[^'"]*?from\s*|import\s*|require\s*\(\s*)(['"])([^'"]+)\1""",
+    re.MULTILINE,
+)
+
+# Bytes twin of IMPORT_RE: regexes on bytes run the same C engine but
+# skip decoding the whole file to str first
+IMPORT_RE_BYTES = re.compile(IMPORT_RE.pattern.encode('ascii'), re.MULTILINE)
+
+# Files above this size are mmap'ed rather than read in process_file
+LARGE_FILE_THRESHOLD = 64 * 1024
+
+# Bytes word counter for the token estimate (same word-based estimate as
+# splitting decoded text, no decode)
+WORD_RE_BYTES = re.compile(rb'\S+')
+
+# Style-file suffixes skipped unless include_css is set; a single
+# endswith(tuple) check runs in C
+STYLE_SUFFIXES = ('.css', '.scss', '.sass')
+
+def _keep_import(imp, include_css):
     """
-    Look for lines in a JS file with an import statement, e.g.:
-      import Something from '...';
-      import { SomethingElse } from '...';
-      import '...';
-      or require('...')
-    
-    If include_css is True, we also keep CSS/SCSS imports (e.g. .css, .scss).
-    Otherwise, we skip them.
-    
-    Return a list of local import paths that typically start with '.' or '/'.
+    True if an extracted module specifier is a local path we follow:
+    relative/absolute (third-party names like 'react' never resolve in
+    the repo), and not a style file unless include_css is set.
+    """
+    if not (imp.startswith('.') or imp.startswith('/')):
+        return False
+    if not include_css and imp.endswith(STYLE_SUFFIXES):
+        return False
+    return True
+
+def _scan_buffer(buf, include_css, do_token_count):
+    """
+    Run the token estimate and import extraction over one bytes-like
+    buffer (bytes or mmap) and return (token_count, imports).
+
+    Both scans work on raw bytes: the file is never decoded to str, and
+    only the matched module specifiers are. Import-free buffers are
+    detected with two cheap substring probes before the regex runs,
+    so e.g. vendored data files and large JSON pay almost nothing.
+    """
+    token_count = 0
+    if do_token_count:
+        token_count = int(sum(1 for _ in WORD_RE_BYTES.finditer(buf)) * 1.2)
+    # .find() rather than `in`: mmap has no substring __contains__
+    if buf.find(b'import') == -1 and buf.find(b'require') == -1:
+        return token_count, []
+    imports = [
+        imp for imp in (
+            m.group(2).decode('utf-8', 'replace').strip()
+            for m in IMPORT_RE_BYTES.finditer(buf)
+        )
+        if _keep_import(imp, include_css)
+    ]
+    return token_count, imports
+
+def process_file(file_path, include_css=False, do_token_count=False):
+    """
+    Single read pass over one file: returns (token_count, imports).
+    The token estimate and the import regex both run on the same buffer,
+    so each visited file is opened once instead of twice.
+
+    Files over LARGE_FILE_THRESHOLD (think vendored bundles) are
+    memory-mapped instead of read so the page cache is shared and
+    nothing is copied into a Python bytes object.
     """
-    imports = []
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line = line.strip()
-                # A naive check: look for lines that start with 'import' or contain `require(`
-                if line.startswith("import "):
-                    # We'll roughly parse out whatever is in the quotes
-                    start_quote = line.find("'")
-                    if start_quote == -1:
-                        start_quote = line.find('"')
-                    end_quote = line.rfind("'")
-                    if end_quote == -1:
-                        end_quote = line.rfind('"')
-
-                    if start_quote != -1 and end_quote != -1 and end_quote > start_quote:
-                        import_path = line[start_quote+1:end_quote].strip()
-                        imports.append(import_path)
-                elif "require(" in line:
-                    # e.g. const X = require('somePath');
-                    start_quote = line.find("'")
-                    if start_quote == -1:
-                        start_quote = line.find('"')
-                    end_quote = line.rfind("'")
-                    if end_quote == -1:
-                        end_quote = line.rfind('"')
-                    if start_quote != -1 and end_quote != -1 and end_quote > start_quote:
-                        import_path = line[start_quote+1:end_quote].strip()
-                        imports.append(import_path)
+        if os.path.getsize(file_path) > LARGE_FILE_THRESHOLD:
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _scan_buffer(mm, include_css, do_token_count)
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
     except Exception as e:
         print(f"Warning: Could not read file {file_path}. Error: {e}", file=sys.stderr)
+        return 0, []
 
-    # Filter out anything that is clearly a third-party import (e.g. 'react', 'lodash', etc.).
-    # We'll only keep local or relative paths that typically start with './', '../', or '/'
-    local_imports = []
-    for imp in imports:
-        if imp.startswith('.') or imp.startswith('/'):
-            # If include_css=False, skip typical style files
-            if not include_css and (
-                imp.endswith('.css') or
-                imp.endswith('.scss') or
-                imp.endswith('.sass') or
-                '.module.scss' in imp
-            ):
-                # Skip style imports if user doesn't want them
-                continue
-            local_imports.append(imp)
+    return _scan_buffer(data, include_css, do_token_count)
 
-    return local_imports
+def build_file_set(repo_root):
+    """
+    Walk repo_root once and return the set of absolute paths of every
+    file in it. resolve_import_path then answers its up-to-13 candidate
+    probes per import with hash lookups instead of stat() syscalls.
 
-def resolve_import_path(current_file, import_path, repo_root, include_css=False):
+    The walk uses os.scandir directly: DirEntry.path is already joined,
+    and is_dir() is answered from the directory read (d_type) without an
+    extra stat() per entry on Linux.
+    """
+    file_set = set()
+    stack = [os.path.abspath(repo_root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        file_set.add(entry.path)
+        except OSError as e:
+            print(f"Warning: Could not scan directory. Error: {e}", file=sys.stderr)
+    return file_set
+
+def resolve_import_path(current_file, import_path, repo_root, file_set, include_css=False):
     """
     Given the current file path and an import path like '../SomeFolder/SomeModule',
     resolve to an absolute path. We only handle .js, .jsx, .ts, .tsx by default,
     plus style files if include_css=True (CSS, SCSS, etc.).
+    Candidates are checked against the prebuilt 'file_set' rather than
+    the filesystem.
     """
     # If it's an absolute path (e.g. '/components/SomeFile'), treat that
     # as relative to the repo root. Otherwise it's relative to the folder of current_file.
@@ -153,38 +259,44 @@ def resolve_import_path(current_file, import_path, repo_root, include_css=False)
     # Then as a fallback, we try our typical extension guesses.
     checked_any = False
     if os.path.splitext(candidate_base)[1]:
-        if os.path.isfile(candidate_base):
-            return os.path.abspath(candidate_base)
+        candidate_abs = os.path.abspath(candidate_base)
+        if candidate_abs in file_set:
+            return candidate_abs
         checked_any = True
 
     for ext in possible_extensions:
-        candidate = candidate_base + ext
-        if os.path.isfile(candidate):
-            return os.path.abspath(candidate)
+        candidate_abs = os.path.abspath(candidate_base + ext)
+        if candidate_abs in file_set:
+            return candidate_abs
 
     # If nothing is found, return None
     return None
 
-def skip_non_text_or_images(filepath, include_images=False):
+def skip_non_text_or_images(filepath, ext, include_images=False):
     """
     Return True if the file should be skipped due to:
       - It's not a text file (per chardet) AND it's not an allowed image
       - Or if we're not including images and it's an image file.
     Otherwise, return False (meaning: do NOT skip).
-    """
-    # Check extension
-    _, ext = os.path.splitext(filepath)
-    ext = ext.lower()
 
+    'ext' is the already-lowercased extension; callers split it once and
+    reuse it rather than having every check re-run splitext/lower.
+    """
     if ext in IMAGE_EXTENSIONS:
         # If user doesn't want images, skip
         if not include_images:
             return True
-        # If user does want images, we keep them. 
+        # If user does want images, we keep them.
         # (But be aware the BFS might not parse them for further imports anyway.)
         return False
 
-    # Not an image extension -> fallback to is_text_file check
+    # Known-by-extension fast paths: no open(), no sniff
+    if ext in BINARY_EXTENSIONS:
+        return True
+    if ext in TEXT_EXTENSIONS:
+        return False
+
+    # Unknown extension -> fallback to is_text_file check
     if not is_text_file(filepath):
         return True
 
@@ -202,11 +314,29 @@ def traverse_js_deps(repo_root, start_files, ignore_patterns, do_token_count=Fal
       - If 'max_depth' is an integer, we only expand that many levels
         of imports. If 'max_depth' == 'all', we expand fully.
 
+    Deduplication happens at enqueue time: a path enters the frontier at
+    most once, ever, so no ignore/classify/read work is spent on
+    duplicates and the queue can't balloon on high fan-in graphs.
+
+    The BFS is level-synchronous: every file in the current frontier is
+    read and parsed in parallel by a thread pool (the reads release the
+    GIL), then the results are merged serially into the next frontier,
+    so visited/all_files never need locking.
+
     Returns:
-      (all_files, total_tokens): a list of unique files, plus approximate token count (if do_token_count=True).
+      (all_files, total_tokens): a list of unique (path, ext) pairs, plus approximate token count (if do_token_count=True).
     """
-    visited = set()  # store absolute paths to avoid duplicates
-    queue = deque()
+    enqueued = set()  # absolute paths ever added to a frontier
+
+    # Compiled, prefix-bucketed patterns replace a per-pattern fnmatch loop
+    ignore_index = compile_ignore_patterns(ignore_patterns)
+
+    # One walk up front replaces per-candidate stat() probes during resolution
+    file_set = build_file_set(repo_root)
+
+    # The same relative import from the same directory recurs constantly
+    # (shared modules), so cache resolutions
+    resolve_cache = {}
 
     # Convert max_depth to an integer or None if "all"
     if isinstance(max_depth, str) and max_depth.lower() == "all":
@@ -217,97 +347,116 @@ def traverse_js_deps(repo_root, start_files, ignore_patterns, do_token_count=Fal
         # fallback if user typed something weird
         max_depth = None
 
-    # Initialize the queue with all start files, each with initial depth=0
-    for sf in start_files:
-        queue.append((sf, 0))
-
     all_files = []
     total_tokens = 0
 
-    while queue:
-        current_file, cur_depth = queue.popleft()
-        relpath = os.path.relpath(current_file, repo_root)
-
-        if current_file in visited:
-            print(f"Already processed '{relpath}'", file=sys.stderr)
-            continue
-
-        visited.add(current_file)
-
-        # Check ignore patterns
-        ignored, matched_pattern = should_ignore(relpath, ignore_patterns)
-        if ignored:
-            print(f"Skipping file '{relpath}' due to ignore pattern '{matched_pattern}'", file=sys.stderr)
-            continue
-
-        # Check if it’s text or allowed image (skip otherwise)
-        if skip_non_text_or_images(current_file, include_images=include_images):
-            print(f"Skipping binary/unwanted file '{relpath}'", file=sys.stderr)
-            continue
+    def worker(entry):
+        return process_file(entry[0], include_css=include_css_imports,
+                            do_token_count=do_token_count)
 
-        # Optionally accumulate token count for text-based files only
-        # (You might not want to count tokens in image files.)
-        _, ext = os.path.splitext(current_file)
-        ext = ext.lower()
-        if do_token_count and ext not in IMAGE_EXTENSIONS:
-            try:
-                with open(current_file, 'r', encoding='utf-8', errors='replace') as f:
-                    file_content = f.read()
-                total_tokens += approximate_token_count(file_content)
-            except Exception as e:
-                print(f"Warning: Could not read file {relpath}. Error: {e}", file=sys.stderr)
-
-        # Keep track of the file
-        all_files.append(current_file)
-
-        # If we've reached max_depth (cur_depth >= max_depth), do not expand further
-        if max_depth is not None and cur_depth >= max_depth:
-            continue
-
-        # If it's an image, there won't be any further imports to parse, so skip
-        if ext in IMAGE_EXTENSIONS:
-            continue
-
-        # Otherwise, parse and queue up next-level imports
-        local_imports = extract_js_imports(current_file, include_css=include_css_imports)
-        for imp in local_imports:
-            resolved_path = resolve_import_path(current_file, imp, repo_root, include_css=include_css_imports)
-            if resolved_path and resolved_path not in visited:
-                queue.append((resolved_path, cur_depth + 1))
+    # Start files form the depth-0 frontier. Paths are interned so the
+    # heavy set/dict membership traffic hashes cached, pointer-compared
+    # strings.
+    frontier = []
+    for sf in start_files:
+        sf = sys.intern(sf)
+        if sf not in enqueued:
+            enqueued.add(sf)
+            frontier.append(sf)
+    depth = 0
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        while frontier:
+            # Serial prefilter: dedup, ignore patterns, and the text/image
+            # classification are cheap; only files that actually need
+            # reading are handed to the thread pool.
+            to_process = []
+            for current_file in frontier:
+                relpath = os.path.relpath(current_file, repo_root)
+
+                # Split once per file; every downstream check reuses it
+                ext = os.path.splitext(current_file)[1].lower()
+
+                # Check ignore patterns
+                ignored, matched_pattern = should_ignore(relpath, ignore_index, ignore_patterns)
+                if ignored:
+                    print(f"Skipping file '{relpath}' due to ignore pattern '{matched_pattern}'", file=sys.stderr)
+                    continue
+
+                # Check if it’s text or allowed image (skip otherwise)
+                if skip_non_text_or_images(current_file, ext, include_images=include_images):
+                    print(f"Skipping binary/unwanted file '{relpath}'", file=sys.stderr)
+                    continue
+
+                # Images are never read: no tokens to count, no imports to parse
+                if ext in IMAGE_EXTENSIONS:
+                    all_files.append((current_file, ext))
+                    continue
+
+                to_process.append((current_file, ext))
+
+            expand = max_depth is None or depth < max_depth
+            next_frontier = []
+
+            if not (do_token_count or expand):
+                # Leaf level with no token counting: nothing needs reading
+                all_files.extend(to_process)
+            else:
+                # Read and parse the whole frontier in parallel, merge serially
+                for entry, (tokens, local_imports) in zip(to_process, executor.map(worker, to_process)):
+                    path = entry[0]
+                    total_tokens += tokens
+                    all_files.append(entry)
+
+                    if not expand:
+                        continue
+
+                    current_dir = os.path.dirname(path)
+                    for imp in local_imports:
+                        cache_key = (current_dir, imp)
+                        if cache_key in resolve_cache:
+                            resolved_path = resolve_cache[cache_key]
+                        else:
+                            resolved_path = resolve_import_path(
+                                path, imp, repo_root, file_set, include_css=include_css_imports
+                            )
+                            if resolved_path is not None:
+                                resolved_path = sys.intern(resolved_path)
+                            resolve_cache[cache_key] = resolved_path
+                        if resolved_path and resolved_path not in enqueued:
+                            enqueued.add(resolved_path)
+                            next_frontier.append(resolved_path)
+
+            frontier = next_frontier
+            depth += 1
 
     return all_files, total_tokens
 
 def create_flat_output(files_list, repo_root, output_file):
     """
     Write the contents of all given files to 'output_file', each preceded
-    by a header line.
+    by a header line. Every file is streamed to the output handle in
+    chunks via shutil.copyfileobj, so peak memory stays at one chunk
+    instead of the whole combined output (which previously got built as
+    a list of strings and then joined — roughly 2x the corpus size).
     """
-    combined_content = []
-    for fpath in files_list:
-        relpath = os.path.relpath(fpath, repo_root)
-        try:
-            # If it's an image, we might not want to read binary data. 
-            # So let's do a quick extension check:
-            _, ext = os.path.splitext(fpath)
-            ext = ext.lower()
-            if ext in IMAGE_EXTENSIONS:
-                # Option A: Skip writing binary data to output file
-                # combined_content.append(f"===== FILE (image skipped): {relpath} =====\n")
-                # Option B: just note that we found an image
-                combined_content.append(f"===== FILE: {relpath} =====\n[Image file skipped]\n\n")
-                continue
-
-            # Otherwise, read text-based content
-            with open(fpath, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            header = f"===== FILE: {relpath} =====\n"
-            combined_content.append(header + content + "\n")
-        except Exception as e:
-            print(f"Warning: Could not open file {relpath}. Error: {e}", file=sys.stderr)
-
-    final_output = "".join(combined_content)
     with open(output_file, 'w', encoding='utf-8') as out_f:
-        out_f.write(final_output)
+        for fpath, ext in files_list:
+            relpath = os.path.relpath(fpath, repo_root)
+            try:
+                # The traversal already classified the extension
+                if ext in IMAGE_EXTENSIONS:
+                    # Just note that we found an image
+                    out_f.write(f"===== FILE: {relpath} =====\n[Image file skipped]\n\n")
+                    continue
+
+                # Otherwise, stream text-based content
+                out_f.write(f"===== FILE: {relpath} =====\n")
+                with open(fpath, 'r', encoding='utf-8', errors='replace') as f:
+                    shutil.copyfileobj(f, out_f, 1 << 20)
+                out_f.write("\n")
+            except Exception as e:
+                print(f"Warning: Could not open file {relpath}. Error: {e}", file=sys.stderr)
 
 def main():
     if len(sys.argv) < 2:
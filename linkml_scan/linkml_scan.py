@@ -2,7 +2,14 @@
 
 import json
 import sys
-from collections import defaultdict, deque
+from collections import deque
+
+# orjson (Rust) parses and serializes multi-MB schemas several times
+# faster than stdlib json; fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def main():
     """
@@ -26,8 +33,9 @@ def main():
     out_file = sys.argv[3]
 
     # 1) Load the full schema from JSON
-    with open(schema_file, "r", encoding="utf-8") as f:
-        full_schema = json.load(f)
+    with open(schema_file, "rb") as f:
+        raw = f.read()
+    full_schema = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     # Ensure we have a top-level $defs
     if "$defs" not in full_schema:
@@ -36,46 +44,40 @@ def main():
 
     defs_dict = full_schema["$defs"]
 
-    # 2) Build a list of FORWARD edges from $refs.
-    #    For each definition that references X, we store (currentDef -> X).
-    #    We do NOT add the backward edge (X -> currentDef).
-    all_edges = []
-
-    for def_name, def_obj in defs_dict.items():
-        # find references in def_obj
-        referenced_defs = find_all_refs(def_obj)
-        for refd_name in referenced_defs:
-            # FORWARD edge only
-            all_edges.append((def_name, refd_name))
-
-    # 3) Construct adjacency from all_edges in one pass
-    adjacency = defaultdict(set)
-    for from_def, to_def in all_edges:
-        adjacency[from_def].add(to_def)
-
-    # 4) BFS or DFS from `target_def` to find all connected definitions, forward only
-    reachable = set()
-    queue = deque([target_def])
-
+    # 2) BFS from `target_def`, forward only. Each reachable definition's
+    #    fragment is walked exactly once: the walk yields the dicts that
+    #    hold $refs, which both drives the traversal and stages those
+    #    dicts for the rewrite pass — no separate edge list, adjacency
+    #    map, or prune re-walk over the same JSON.
     if target_def not in defs_dict:
         print(f"Warning: '{target_def}' not found in $defs, but continuing BFS anyway.")
 
+    # Names are marked reachable when enqueued, not when popped, so a
+    # definition referenced from many places is queued (and walked) once.
+    reachable = {target_def}
+    ref_holders = []  # dicts with a "$ref" key, found in visited defs
+    queue = deque([target_def])
+
     while queue:
         current = queue.popleft()
-        if current in reachable:
+        def_obj = defs_dict.get(current)
+        if def_obj is None:
             continue
-        reachable.add(current)
-        for neighbor in adjacency[current]:
-            if neighbor not in reachable:
-                queue.append(neighbor)
+        for holder in iter_ref_dicts(def_obj):
+            def_name = extract_def_name(holder["$ref"])
+            if def_name:
+                ref_holders.append(holder)
+                if def_name not in reachable:
+                    reachable.add(def_name)
+                    queue.append(def_name)
 
-    # 5) Build a new $defs containing only the reachable definitions
+    # 3) Build a new $defs containing only the reachable definitions
     new_defs = {}
     for def_name in reachable:
         if def_name in defs_dict:
             new_defs[def_name] = defs_dict[def_name]
 
-    # 6) Replace the original $defs with our truncated version.
+    # 4) Replace the original $defs with our truncated version.
     minimized_schema = {}
     for k, v in full_schema.items():
         if k == "$defs":
@@ -83,46 +85,45 @@ def main():
         else:
             minimized_schema[k] = v
 
-    # 7) Prune references that point to definitions not in `reachable`.
-    for def_name in list(new_defs.keys()):
-        new_defs[def_name] = prune_refs(new_defs[def_name], reachable)
-
-    # 8) Write final minimized schema to out_file
-    with open(out_file, "w", encoding="utf-8") as out_f:
-        json.dump(minimized_schema, out_f, indent=2)
+    # 5) Rewrite the staged references that point to definitions not in
+    #    `reachable`, replacing them with "#/$defs/REMOVED_REFERENCE" so
+    #    they're visible but no longer dangling.
+    for holder in ref_holders:
+        def_name = extract_def_name(holder["$ref"])
+        if def_name and def_name not in reachable:
+            holder["$ref"] = "#/$defs/REMOVED_REFERENCE"
+
+    # 6) Write final minimized schema to out_file
+    if orjson is not None:
+        with open(out_file, "wb") as out_f:
+            out_f.write(orjson.dumps(minimized_schema, option=orjson.OPT_INDENT_2))
+    else:
+        with open(out_file, "w", encoding="utf-8") as out_f:
+            json.dump(minimized_schema, out_f, indent=2)
 
     print(f"Done. Wrote minimized schema with {len(new_defs)} definitions to '{out_file}'.")
 
 
-def find_all_refs(schema_fragment):
+def iter_ref_dicts(schema_fragment):
     """
-    Recursively scan 'schema_fragment' (which can be dict, list, or primitive)
-    for local references of the form:
-        { "$ref": "#/$defs/SomeDefName" }
-    Returns a set of all 'SomeDefName' that appear in $ref fields.
+    Walk 'schema_fragment' (which can be dict, list, or primitive) with
+    an explicit stack, yielding every dict that carries a "$ref" key.
+    Yielding the holding dict (rather than just the referenced name)
+    lets the caller both follow the reference and rewrite it later
+    without a second pass over the fragment.
     """
-    results = set()
-
-    if isinstance(schema_fragment, dict):
-        # if there's a "$ref", parse it
-        if "$ref" in schema_fragment:
-            ref_str = schema_fragment["$ref"]
-            # We'll parse out the definition name from something like "#/$defs/XYZ"
-            def_name = extract_def_name(ref_str)
-            if def_name:
-                results.add(def_name)
+    stack = [schema_fragment]
 
-        # then recurse into values
-        for value in schema_fragment.values():
-            results |= find_all_refs(value)
-
-    elif isinstance(schema_fragment, list):
-        # recurse into list elements
-        for item in schema_fragment:
-            results |= find_all_refs(item)
-
-    # if it's a primitive (string, int, etc.), no references
-    return results
+    while stack:
+        fragment = stack.pop()
+        if isinstance(fragment, dict):
+            if "$ref" in fragment:
+                yield fragment
+            # then descend into values
+            stack.extend(fragment.values())
+        elif isinstance(fragment, list):
+            stack.extend(fragment)
+        # primitives (string, int, etc.) carry no references
 
 
 def extract_def_name(ref_str):
@@ -136,39 +137,5 @@ def extract_def_name(ref_str):
     return None
 
 
-def prune_refs(schema_fragment, keep_set):
-    """
-    Return a copy of schema_fragment (dict/list/primitive),
-    removing or modifying any $ref that points to a definition *not* in keep_set.
-    We'll replace them with "#/$defs/REMOVED_REFERENCE" so it's visible
-    but no longer points to anything invalid.
-    """
-
-    if isinstance(schema_fragment, dict):
-        new_frag = {}
-        for k, v in schema_fragment.items():
-            if k == "$ref":
-                def_name = extract_def_name(v)
-                if def_name and def_name not in keep_set:
-                    # references a def we are not keeping => replace
-                    new_frag[k] = "#/$defs/REMOVED_REFERENCE"
-                else:
-                    # keep as-is
-                    new_frag[k] = v
-            else:
-                new_frag[k] = prune_refs(v, keep_set)
-        return new_frag
-
-    elif isinstance(schema_fragment, list):
-        new_list = []
-        for item in schema_fragment:
-            new_list.append(prune_refs(item, keep_set))
-        return new_list
-
-    else:
-        # primitive
-        return schema_fragment
-
-
 if __name__ == "__main__":
     main()